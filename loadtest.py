@@ -0,0 +1,322 @@
+"""Prueba de carga de la API del panel web sin conexión a Discord.
+
+Arranca la aplicación Flask de main.py en un proceso hijo, reemplaza el bot
+por un cliente de Discord simulado con muchos servidores, roles, canales y
+emojis, y lanza peticiones HTTP concurrentes contra cada endpoint desde el
+proceso principal. Al estar en procesos separados, los hilos del generador de
+carga no compiten por el GIL con los del servidor.
+
+Uso:
+    python loadtest.py --guilds 200 --roles 250 --channels 500 --emojis 50 \\
+        --concurrency 32 --requests 2000
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Thread
+
+ENDPOINTS = ["config", "config_update", "guilds", "roles", "channels", "emojis", "publish"]
+
+# Cliente de Discord simulado
+
+class FakeAsset:
+    def __init__(self, url: str):
+        self.url = url
+
+class FakeColor:
+    def __init__(self, value: int):
+        self.value = value
+
+class FakeRole:
+    def __init__(self, role_id: int, name: str, color: int, position: int):
+        self.id = role_id
+        self.name = name
+        self.color = FakeColor(color)
+        self.position = position
+        self.mention = f"<@&{role_id}>"
+
+class FakeCategory:
+    def __init__(self, name: str):
+        self.name = name
+
+class FakeMessage:
+    def __init__(self, message_id: int, client: "FakeDiscordClient"):
+        self.id = message_id
+        self.client = client
+
+    async def add_reaction(self, emoji):
+        await self.client.simulate_latency()
+
+class FakeTextChannel:
+    def __init__(self, channel_id: int, name: str, category, position: int, client: "FakeDiscordClient"):
+        self.id = channel_id
+        self.name = name
+        self.category = category
+        self.position = position
+        self.mention = f"<#{channel_id}>"
+        self.client = client
+
+    async def send(self, content=None, *, embed=None):
+        await self.client.simulate_latency()
+        return FakeMessage(self.client.next_id(), self.client)
+
+class FakeEmoji:
+    def __init__(self, emoji_id: int, name: str, animated: bool):
+        self.id = emoji_id
+        self.name = name
+        self.animated = animated
+        extension = "gif" if animated else "png"
+        self.url = f"https://cdn.discordapp.com/emojis/{emoji_id}.{extension}"
+
+class FakeGuild:
+    def __init__(self, guild_id: int, name: str, member_count: int, icon):
+        self.id = guild_id
+        self.name = name
+        self.member_count = member_count
+        self.icon = icon
+        self.roles = []
+        self.text_channels = []
+        self.emojis = []
+        self.channels_by_id = {}
+
+    def get_channel(self, channel_id: int):
+        return self.channels_by_id.get(channel_id)
+
+class FakeDiscordClient:
+    """Sustituto del bot con la interfaz que usan las rutas de la API"""
+
+    def __init__(self, guilds: int, roles: int, channels: int, emojis: int, latency: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.snowflake = 1_100_000_000_000_000_000
+        self.rng = random.Random(seed)
+        self.guilds = []
+        self.guilds_by_id = {}
+
+        for g in range(guilds):
+            icon = FakeAsset(f"https://cdn.discordapp.com/icons/{g}/icon.png") if g % 2 == 0 else None
+            guild = FakeGuild(self.next_id(), f"Servidor {g}", self.rng.randint(10, 100_000), icon)
+
+            guild.roles.append(FakeRole(guild.id, "@everyone", 0, 0))
+            for r in range(roles):
+                guild.roles.append(FakeRole(self.next_id(), f"rol-{r}", self.rng.randint(0, 0xFFFFFF), r + 1))
+
+            categories = [FakeCategory(f"Categoría {c}") for c in range(max(1, channels // 10))]
+            for c in range(channels):
+                category = self.rng.choice(categories) if c % 5 else None
+                channel = FakeTextChannel(self.next_id(), f"canal-{c}", category, c, self)
+                guild.text_channels.append(channel)
+                guild.channels_by_id[channel.id] = channel
+
+            for e in range(emojis):
+                guild.emojis.append(FakeEmoji(self.next_id(), f"emoji_{e}", e % 7 == 0))
+
+            self.guilds.append(guild)
+            self.guilds_by_id[guild.id] = guild
+
+        # Loop propio, como el del bot real, para /api/publish
+        self.loop = asyncio.new_event_loop()
+        Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def next_id(self) -> int:
+        self.snowflake += 1
+        return self.snowflake
+
+    def get_guild(self, guild_id: int):
+        return self.guilds_by_id.get(guild_id)
+
+    async def simulate_latency(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+# Generación de peticiones
+
+def build_request(endpoint: str, guild_ids: list, publish_guild_id: int, rng: random.Random):
+    """Devuelve (método, ruta, cuerpo) para una petición al endpoint"""
+    guild_id = rng.choice(guild_ids)
+    if endpoint == "config":
+        return "GET", "/api/config", None
+    if endpoint == "config_update":
+        return "POST", "/api/config", {"min_account_age_hours": rng.randint(1, 72)}
+    if endpoint == "guilds":
+        return "GET", "/api/guilds", None
+    if endpoint in ("roles", "channels", "emojis"):
+        return "GET", f"/api/guild/{guild_id}/{endpoint}", None
+    if endpoint == "publish":
+        return "POST", "/api/publish", {"guild_id": str(publish_guild_id)}
+    raise ValueError(f"Endpoint desconocido: {endpoint}")
+
+def send_request(host: str, port: int, method: str, path: str, body, timeout: float):
+    """Ejecuta una petición y devuelve (latencia en segundos, código HTTP o None si falló)"""
+    payload = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"} if payload is not None else {}
+    start = time.perf_counter()
+    try:
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        finally:
+            conn.close()
+    except (OSError, http.client.HTTPException):
+        status = None
+    return time.perf_counter() - start, status
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Percentil por rango más cercano sobre una lista ordenada"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def run_endpoint(endpoint: str, args, guild_ids: list, publish_guild_id: int, port: int) -> dict:
+    """Lanza args.requests peticiones concurrentes a un endpoint y resume los resultados"""
+    rng = random.Random(args.seed)
+    requests = [build_request(endpoint, guild_ids, publish_guild_id, rng) for _ in range(args.requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda req: send_request(args.host, port, req[0], req[1], req[2], args.timeout),
+            requests
+        ))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, status in results if status is None or status >= 400)
+    return {
+        "endpoint": endpoint,
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": errors / len(results) if results else 0.0,
+        "rps": len(results) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000
+    }
+
+def print_report(results: list):
+    header = f"{'Endpoint':<15}{'Peticiones':>11}{'Req/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'Errores':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['endpoint']:<15}{r['requests']:>11}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}"
+            f"{r['p90_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}{r['error_rate']:>9.1%}"
+        )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API del panel con un Discord simulado")
+    parser.add_argument("--guilds", type=int, default=100, help="Servidores simulados")
+    parser.add_argument("--roles", type=int, default=100, help="Roles por servidor")
+    parser.add_argument("--channels", type=int, default=200, help="Canales de texto por servidor")
+    parser.add_argument("--emojis", type=int, default=50, help="Emojis por servidor")
+    parser.add_argument("--concurrency", type=int, default=16, help="Peticiones simultáneas")
+    parser.add_argument("--requests", type=int, default=1000, help="Peticiones por endpoint")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS, help="Endpoints a probar")
+    parser.add_argument("--discord-latency", type=float, default=0.0, help="Latencia simulada de Discord en ms")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por petición en segundos")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="Puerto del servidor (0 = libre)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING", type=str.upper,
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="LOG_LEVEL para la aplicación durante la prueba")
+    parser.add_argument("--json", action="store_true", help="Imprime los resultados en JSON")
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="Termina con código 1 si algún endpoint supera esta tasa de error (0-1)")
+    args = parser.parse_args(argv)
+    if args.guilds < 1 or args.channels < 1:
+        parser.error("--guilds y --channels deben ser al menos 1")
+    if args.concurrency < 1 or args.requests < 1:
+        parser.error("--concurrency y --requests deben ser al menos 1")
+    return args
+
+def serve(args, conn, stop):
+    """Proceso hijo: sirve la aplicación con el Discord simulado hasta que se active stop"""
+    try:
+        # main.py lee la configuración de logging al importarse
+        os.environ["LOG_LEVEL"] = args.log_level
+        import main as elite
+        from werkzeug.serving import make_server
+
+        # werkzeug fija su propio nivel INFO para el log de accesos si no tiene uno
+        logging.getLogger("werkzeug").setLevel(args.log_level)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            elite.CONFIG_FILE = Path(tmp) / "config.json"
+            elite.load_config()
+
+            client = FakeDiscordClient(
+                args.guilds, args.roles, args.channels, args.emojis,
+                latency=args.discord_latency / 1000, seed=args.seed
+            )
+            elite.bot = client
+
+            publish_guild = client.guilds[0]
+            elite.config["verify_channel_id"] = publish_guild.text_channels[0].id
+            elite.config["verify_role_id"] = publish_guild.roles[-1].id
+            elite.save_config()
+
+            server = make_server(args.host, args.port, elite.app, threaded=True)
+            Thread(target=server.serve_forever, daemon=True).start()
+            conn.send(("ready", server.server_port, [g.id for g in client.guilds], publish_guild.id))
+
+            stop.wait()
+            server.shutdown()
+            client.loop.call_soon_threadsafe(client.loop.stop)
+    except Exception as e:
+        conn.send(("error", repr(e)))
+    finally:
+        conn.close()
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    stop = multiprocessing.Event()
+    server_process = multiprocessing.Process(target=serve, args=(args, child_conn, stop), daemon=True)
+    server_process.start()
+    child_conn.close()
+
+    try:
+        try:
+            message = parent_conn.recv()
+        except EOFError:
+            message = ("error", f"el proceso del servidor terminó con código {server_process.exitcode}")
+        if message[0] != "ready":
+            print(f"❌ No se pudo iniciar el servidor: {message[1]}", file=sys.stderr)
+            return 1
+
+        _, port, guild_ids, publish_guild_id = message
+        results = [run_endpoint(endpoint, args, guild_ids, publish_guild_id, port) for endpoint in args.endpoints]
+    finally:
+        stop.set()
+        server_process.join(timeout=10)
+        if server_process.is_alive():
+            server_process.terminate()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+    if args.max_error_rate is not None and any(r["error_rate"] > args.max_error_rate for r in results):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ import datetime
 import os
 import logging
 import json
+import math
 from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
@@ -12,16 +13,193 @@ from flask import Flask, render_template, request, jsonify
 from flask_cors import CORS
 import secrets
 import asyncio
-from threading import Thread
+import atexit
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 
 load_dotenv()
 
 # Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+log_config_warnings = []  # se registran una vez configurado el logging
+
+def env_log_level(name: str, default: str) -> str:
+    """Lee un nivel de log; si no es válido usa el valor por defecto"""
+    value = os.getenv(name, default).upper()
+    if not isinstance(logging.getLevelName(value), int):
+        log_config_warnings.append(f"⚠️ {name} inválido ({value!r}), usando {default}")
+        return default
+    return value
+
+def env_choice(name: str, default: str, choices: tuple) -> str:
+    """Lee una opción de una variable de entorno; si no es válida usa el valor por defecto"""
+    value = os.getenv(name, default).lower()
+    if value not in choices:
+        log_config_warnings.append(f"⚠️ {name} inválido ({value!r}), usando {default}")
+        return default
+    return value
+
+def env_number(name: str, default, cast, minimum, maximum):
+    """Lee un número de una variable de entorno; si no es válido usa el valor por defecto"""
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        value = None
+    # float() acepta "nan" e "inf", que no fallan en la comparación con los límites
+    if value is None or not math.isfinite(value) or not minimum <= value <= maximum:
+        log_config_warnings.append(f"⚠️ {name} inválido ({raw!r}), usando {default}")
+        return default
+    return value
+
+LOG_LEVEL = env_log_level("LOG_LEVEL", "INFO")
+LOG_FORMAT = env_choice("LOG_FORMAT", "text", ("text", "json"))
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() not in ("0", "false", "no")
+LOG_SAMPLE_LIMIT = env_number("LOG_SAMPLE_LIMIT", 20, int, 0, 1_000_000)
+LOG_SAMPLE_WINDOW = env_number("LOG_SAMPLE_WINDOW", 10.0, float, 0.1, 3600)
+
+class JsonFormatter(logging.Formatter):
+    """Formatea cada registro como una línea JSON"""
+
+    extra_fields = ("guild_id", "user_id", "sampled_dropped")
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage()
+        }
+        for field in self.extra_fields:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class GuildSampler(logging.Filter):
+    """Limita por servidor los logs de eventos de alto volumen (reacciones, entradas)"""
+
+    def __init__(self, target: logging.Logger, limit: int, window: float):
+        super().__init__()
+        self.target = target
+        self.limit = limit
+        self.window = window
+        self.buckets = {}  # guild_id -> [inicio de ventana, emitidos, descartados]
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def filter(self, record):
+        if not getattr(record, "sample", False) or self.limit <= 0:
+            return True
+
+        guild_id = getattr(record, "guild_id", None)
+        now = time.monotonic()
+        dropped = 0
+        with self.lock:
+            bucket = self.buckets.get(guild_id)
+            if bucket is None or now - bucket[0] >= self.window:
+                if bucket:
+                    dropped = bucket[2]
+                self.buckets[guild_id] = [now, 1, 0]
+                allowed = True
+            elif bucket[1] < self.limit:
+                bucket[1] += 1
+                allowed = True
+            else:
+                bucket[2] += 1
+                allowed = False
+
+        if dropped:
+            self.report(guild_id, dropped)
+        return allowed
+
+    def report(self, guild_id, dropped: int):
+        """Emite un registro con los logs descartados en una ventana"""
+        self.target.warning(
+            "⚠️ %d logs de eventos descartados por muestreo (servidor %s)", dropped, guild_id,
+            extra={"guild_id": guild_id, "sampled_dropped": dropped}
+        )
+
+    def flush(self, force: bool = False):
+        """Informa de los descartes de las ventanas cerradas (o de todas si force)"""
+        now = time.monotonic()
+        pending = []
+        with self.lock:
+            for guild_id, bucket in list(self.buckets.items()):
+                if force or now - bucket[0] >= self.window:
+                    if bucket[2]:
+                        pending.append((guild_id, bucket[2]))
+                    # Las ventanas cerradas se eliminan para no acumular servidores
+                    del self.buckets[guild_id]
+        for guild_id, dropped in pending:
+            self.report(guild_id, dropped)
+
+    def start(self):
+        """Revisa periódicamente las ventanas cerradas en un hilo en segundo plano"""
+        def run():
+            while not self.stopped.wait(self.window):
+                self.flush()
+
+        threading.Thread(target=run, name="EliteVerify-log-sampler", daemon=True).start()
+
+    def stop(self):
+        """Detiene el hilo e informa de los descartes pendientes"""
+        self.stopped.set()
+        self.flush(force=True)
+
+class DeferredQueueHandler(QueueHandler):
+    """Encola el registro con el mensaje ya interpolado; el formateo final
+    (fecha, JSON, traceback) ocurre en el hilo escritor"""
+
+    def prepare(self, record):
+        # Los argumentos se interpolan aquí: el llamador puede seguir modificándolos
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def sample_extra(guild_id: int, user_id: Optional[int] = None) -> dict:
+    """Campos extra para marcar un log de evento frecuente como muestreable"""
+    return {"guild_id": guild_id, "user_id": user_id, "sample": True}
+
+def setup_logging():
+    """Configura el logging: texto o JSON, escrito desde un hilo en segundo plano"""
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+
+    if LOG_ASYNC:
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        root.handlers = [DeferredQueueHandler(log_queue)]
+    else:
+        root.handlers = [stream_handler]
+
+setup_logging()
 logger = logging.getLogger('EliteVerify')
+for warning in log_config_warnings:
+    logger.warning(warning)
+
+if LOG_SAMPLE_LIMIT > 0:
+    sampler = GuildSampler(logger, LOG_SAMPLE_LIMIT, LOG_SAMPLE_WINDOW)
+    logger.addFilter(sampler)
+    sampler.start()
+    # atexit ejecuta en orden inverso: el resumen final se encola antes de detener el listener
+    atexit.register(sampler.stop)
 
 # Configuración del bot
 intents = discord.Intents.default()
@@ -62,7 +240,7 @@ def save_config():
             json.dump(config, f, indent=2, ensure_ascii=False)
         logger.info("✅ Configuración guardada correctamente")
     except Exception as e:
-        logger.error(f"❌ Error al guardar configuración: {e}")
+        logger.error("❌ Error al guardar configuración: %s", e)
 
 def load_config():
     """Carga la configuración desde el archivo JSON"""
@@ -78,7 +256,7 @@ def load_config():
             save_config()
             logger.info("📝 Archivo de configuración creado con valores por defecto")
     except Exception as e:
-        logger.error(f"❌ Error al cargar configuración: {e}")
+        logger.error("❌ Error al cargar configuración: %s", e)
         config = default_config.copy()
 
 def get_verification_emoji(guild: discord.Guild):
@@ -98,7 +276,7 @@ async def send_log(guild: discord.Guild, title: str, description: str, color: in
 
         log_channel = guild.get_channel(int(log_channel_id))
         if not log_channel:
-            logger.warning(f"⚠️ Canal de logs no encontrado: {log_channel_id}")
+            logger.warning("⚠️ Canal de logs no encontrado: %s", log_channel_id)
             return
 
         embed = discord.Embed(
@@ -124,7 +302,7 @@ async def send_log(guild: discord.Guild, title: str, description: str, color: in
     except discord.Forbidden:
         logger.error("❌ Sin permisos para enviar logs")
     except Exception as e:
-        logger.error(f"❌ Error al enviar log: {e}")
+        logger.error("❌ Error al enviar log: %s", e)
 
 @bot.event
 async def on_member_join(member: discord.Member):
@@ -144,7 +322,7 @@ async def on_member_join(member: discord.Member):
                     f"Intenta unirte nuevamente cuando tu cuenta cumpla con el requisito."
                 )
             except discord.Forbidden:
-                logger.warning(f"⚠️ No se pudo enviar DM a {member.name}")
+                logger.warning("⚠️ No se pudo enviar DM a %s", member.name)
 
             await member.kick(reason=f"Cuenta muy nueva (<{min_hours}h) - Elite Verify")
 
@@ -161,7 +339,10 @@ async def on_member_join(member: discord.Member):
                 ]
             )
 
-            logger.info(f"🚫 Usuario expulsado: {member} ({member.id}) - {hours:.1f}h")
+            logger.info(
+                "🚫 Usuario expulsado: %s (%s) - %.1fh", member, member.id, hours,
+                extra=sample_extra(member.guild.id, member.id)
+            )
         else:
             await send_log(
                 member.guild,
@@ -175,7 +356,7 @@ async def on_member_join(member: discord.Member):
                 ]
             )
     except Exception as e:
-        logger.error(f"❌ Error en on_member_join: {e}")
+        logger.error("❌ Error en on_member_join: %s", e)
 
 @bot.event
 async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
@@ -211,11 +392,11 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
 
         role = guild.get_role(int(role_id))
         if not role:
-            logger.error(f"❌ Rol de verificación no encontrado: {role_id}")
+            logger.error("❌ Rol de verificación no encontrado: %s", role_id)
             return
 
         if role in member.roles:
-            logger.info(f"ℹ️ {member} ya tiene el rol de verificación")
+            logger.info("ℹ️ %s ya tiene el rol de verificación", member, extra=sample_extra(guild.id, member.id))
             return
 
         await member.add_roles(role, reason="Verificado - Elite Verify")
@@ -233,7 +414,7 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
             ]
         )
 
-        logger.info(f"✅ Usuario verificado: {member} ({member.id})")
+        logger.info("✅ Usuario verificado: %s (%s)", member, member.id, extra=sample_extra(guild.id, member.id))
 
         try:
             embed = discord.Embed(
@@ -248,10 +429,10 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
             )
             await member.send(embed=embed)
         except discord.Forbidden:
-            logger.warning(f"⚠️ No se pudo enviar DM de confirmación a {member}")
+            logger.warning("⚠️ No se pudo enviar DM de confirmación a %s", member, extra=sample_extra(guild.id, member.id))
 
     except Exception as e:
-        logger.error(f"❌ Error en on_raw_reaction_add: {e}")
+        logger.error("❌ Error en on_raw_reaction_add: %s", e)
 
 @bot.event
 async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
@@ -298,9 +479,9 @@ async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
                 ]
             )
 
-            logger.info(f"🔄 Verificación removida: {member} ({member.id})")
+            logger.info("🔄 Verificación removida: %s (%s)", member, member.id, extra=sample_extra(guild.id, member.id))
     except Exception as e:
-        logger.error(f"❌ Error en on_raw_reaction_remove: {e}")
+        logger.error("❌ Error en on_raw_reaction_remove: %s", e)
 
 @tree.command(name="panel", description="🌐 Obtén el enlace al panel web de configuración")
 @app_commands.checks.has_permissions(administrator=True)
@@ -327,7 +508,7 @@ async def panel_command(interaction: discord.Interaction):
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     except Exception as e:
-        logger.error(f"❌ Error en comando panel: {e}")
+        logger.error("❌ Error en comando panel: %s", e)
         await interaction.response.send_message(
             "❌ Error al obtener el enlace del panel.",
             ephemeral=True
@@ -375,7 +556,7 @@ async def info_command(interaction: discord.Interaction):
         await interaction.response.send_message(embed=embed, ephemeral=False)
 
     except Exception as e:
-        logger.error(f"❌ Error en comando info: {e}")
+        logger.error("❌ Error en comando info: %s", e)
         await interaction.response.send_message(
             "❌ Error al mostrar información.",
             ephemeral=True
@@ -389,11 +570,11 @@ async def on_ready():
         await tree.sync()
 
         logger.info("=" * 60)
-        logger.info(f"✅ Elite Verify iniciado correctamente")
-        logger.info(f"👤 Usuario: {bot.user.name} ({bot.user.id})")
-        logger.info(f"📚 discord.py: {discord.__version__}")
-        logger.info(f"🌐 Servidores: {len(bot.guilds)}")
-        logger.info(f"📁 Config: {CONFIG_FILE}")
+        logger.info("✅ Elite Verify iniciado correctamente")
+        logger.info("👤 Usuario: %s (%s)", bot.user.name, bot.user.id)
+        logger.info("📚 discord.py: %s", discord.__version__)
+        logger.info("🌐 Servidores: %d", len(bot.guilds))
+        logger.info("📁 Config: %s", CONFIG_FILE)
         logger.info("=" * 60)
 
         activity = discord.Activity(
@@ -403,7 +584,7 @@ async def on_ready():
         await bot.change_presence(activity=activity, status=discord.Status.online)
 
     except Exception as e:
-        logger.error(f"❌ Error en on_ready: {e}")
+        logger.error("❌ Error en on_ready: %s", e)
 
 # Aplicación web con Flask
 app = Flask(__name__, template_folder="templates", static_folder="static")
@@ -422,7 +603,7 @@ def get_config():
         safe_config = config.copy()
         return jsonify({"success": True, "config": safe_config})
     except Exception as e:
-        logger.error(f"❌ Error al obtener config: {e}")
+        logger.error("❌ Error al obtener config: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route("/api/config", methods=["POST"])
@@ -439,7 +620,7 @@ def update_config():
 
         return jsonify({"success": True, "message": "Configuración actualizada correctamente"})
     except Exception as e:
-        logger.error(f"❌ Error al actualizar config: {e}")
+        logger.error("❌ Error al actualizar config: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route("/api/guilds", methods=["GET"])
@@ -456,27 +637,28 @@ def get_guilds():
             })
         return jsonify({"success": True, "guilds": guilds_data})
     except Exception as e:
-        logger.error(f"❌ Error al obtener guilds: {e}")
+        logger.error("❌ Error al obtener guilds: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route("/api/guild/<guild_id>/roles", methods=["GET"])
 def get_guild_roles(guild_id):
     """Obtiene los roles de un servidor"""
     try:
-        logger.info(f"🔍 Buscando roles para guild_id: {guild_id} (tipo: {type(guild_id)})")
+        logger.debug("🔍 Buscando roles para guild_id: %s", guild_id)
 
         # Convertir a int de forma segura
         try:
             guild_id_int = int(guild_id)
         except ValueError:
-            logger.error(f"❌ ID de servidor inválido: {guild_id}")
+            logger.error("❌ ID de servidor inválido: %s", guild_id)
             return jsonify({"success": False, "error": "ID de servidor inválido"}), 400
 
         guild = bot.get_guild(guild_id_int)
 
         if not guild:
-            logger.error(f"❌ Servidor no encontrado: {guild_id_int}")
-            logger.info(f"📋 Servidores disponibles: {[g.id for g in bot.guilds]}")
+            logger.error("❌ Servidor no encontrado: %s", guild_id_int)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📋 Servidores disponibles: %s", [g.id for g in bot.guilds])
             return jsonify({"success": False, "error": "Servidor no encontrado"}), 404
 
         roles_data = []
@@ -492,19 +674,17 @@ def get_guild_roles(guild_id):
         # Ordenar por posición (más alto primero)
         roles_data.sort(key=lambda x: x["position"], reverse=True)
 
-        logger.info(f"✅ Encontrados {len(roles_data)} roles para {guild.name}")
+        logger.info("✅ Encontrados %d roles para %s", len(roles_data), guild.name)
         return jsonify({"success": True, "roles": roles_data})
     except Exception as e:
-        logger.error(f"❌ Error al obtener roles: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error al obtener roles: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route("/api/guild/<guild_id>/channels", methods=["GET"])
 def get_guild_channels(guild_id):
     """Obtiene los canales de un servidor"""
     try:
-        logger.info(f"🔍 Buscando canales para guild_id: {guild_id}")
+        logger.debug("🔍 Buscando canales para guild_id: %s", guild_id)
 
         try:
             guild_id_int = int(guild_id)
@@ -514,7 +694,7 @@ def get_guild_channels(guild_id):
         guild = bot.get_guild(guild_id_int)
 
         if not guild:
-            logger.error(f"❌ Servidor no encontrado: {guild_id_int}")
+            logger.error("❌ Servidor no encontrado: %s", guild_id_int)
             return jsonify({"success": False, "error": "Servidor no encontrado"}), 404
 
         channels_data = []
@@ -526,19 +706,17 @@ def get_guild_channels(guild_id):
                 "position": channel.position
             })
 
-        logger.info(f"✅ Encontrados {len(channels_data)} canales para {guild.name}")
+        logger.info("✅ Encontrados %d canales para %s", len(channels_data), guild.name)
         return jsonify({"success": True, "channels": channels_data})
     except Exception as e:
-        logger.error(f"❌ Error al obtener canales: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error al obtener canales: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route("/api/guild/<guild_id>/emojis", methods=["GET"])
 def get_guild_emojis(guild_id):
     """Obtiene los emojis personalizados de un servidor"""
     try:
-        logger.info(f"🔍 Buscando emojis para guild_id: {guild_id}")
+        logger.debug("🔍 Buscando emojis para guild_id: %s", guild_id)
 
         try:
             guild_id_int = int(guild_id)
@@ -548,7 +726,7 @@ def get_guild_emojis(guild_id):
         guild = bot.get_guild(guild_id_int)
 
         if not guild:
-            logger.error(f"❌ Servidor no encontrado: {guild_id_int}")
+            logger.error("❌ Servidor no encontrado: %s", guild_id_int)
             return jsonify({"success": False, "error": "Servidor no encontrado"}), 404
 
         emojis_data = []
@@ -560,12 +738,10 @@ def get_guild_emojis(guild_id):
                 "animated": emoji.animated
             })
 
-        logger.info(f"✅ Encontrados {len(emojis_data)} emojis para {guild.name}")
+        logger.info("✅ Encontrados %d emojis para %s", len(emojis_data), guild.name)
         return jsonify({"success": True, "emojis": emojis_data})
     except Exception as e:
-        logger.error(f"❌ Error al obtener emojis: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error al obtener emojis: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route("/api/publish", methods=["POST"])
@@ -639,9 +815,7 @@ def publish_verification():
 
         return jsonify({"success": True, "message": "Mensaje publicado correctamente"})
     except Exception as e:
-        logger.error(f"❌ Error al publicar: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error al publicar: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 def run_bot():
@@ -652,9 +826,10 @@ def run_bot():
         return
 
     try:
-        bot.run(token)
+        # log_handler=None: los logs de discord.py usan la cola configurada en setup_logging
+        bot.run(token, log_handler=None)
     except Exception as e:
-        logger.error(f"❌ Error al iniciar bot: {e}")
+        logger.error("❌ Error al iniciar bot: %s", e)
 
 def run_web():
     """Ejecuta el servidor web"""
@@ -662,7 +837,7 @@ def run_web():
     port = int(os.getenv("PORT", 5000))
     host = "0.0.0.0"  # IMPORTANTE: debe ser 0.0.0.0, no localhost
     
-    logger.info(f"🌐 Servidor web iniciando en {host}:{port}")
+    logger.info("🌐 Servidor web iniciando en %s:%s", host, port)
     app.run(host=host, port=port, debug=False, threaded=True)
 
 if __name__ == "__main__":
@@ -670,11 +845,10 @@ if __name__ == "__main__":
         logger.info("🚀 Iniciando Elite Verify...")
         
         # Iniciar bot en thread separado
-        bot_thread = Thread(target=run_bot, daemon=True)
+        bot_thread = threading.Thread(target=run_bot, daemon=True)
         bot_thread.start()
         
         # Esperar a que el bot se conecte
-        import time
         time.sleep(5)
         
         # Iniciar servidor web (Railway asigna el puerto automáticamente)
@@ -683,5 +857,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         logger.info("⚠️ Bot detenido por el usuario")
     except Exception as e:
-        logger.error(f"❌ Error fatal: {e}")
+        logger.error("❌ Error fatal: %s", e)
 